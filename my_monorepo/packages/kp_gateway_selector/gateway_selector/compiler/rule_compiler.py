@@ -1,5 +1,7 @@
 from __future__ import annotations
+import json
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Any, Tuple, Callable, Optional, List
 
 from kp_gateway_selector.gateway_selector.matchers.base import Matcher, build_matcher
@@ -110,6 +112,12 @@ def _fold_constants_for_any(children: List[Matcher]) -> Matcher:
 
 # --- Compilador principal ---
 
+@lru_cache(maxsize=512)
+def _compile_cached(cond_json: str) -> Matcher:
+    # Los Matchers compilados son inmutables: se pueden compartir entre reglas/snapshots
+    # con la misma condición (ej. republicar un ruleset casi idéntico).
+    return _compile_predicate(json.loads(cond_json))
+
 def compile_predicate(tree: dict, *,
                       debug: bool = False,
                       path: str = "ROOT",
@@ -121,7 +129,30 @@ def compile_predicate(tree: dict, *,
       - flattening (colapso de niveles del mismo tipo),
       - constant folding,
       - short-circuit en runtime.
+
+    Sin debug, el resultado se memoiza por la condición serializada (sort_keys).
     """
+    if not debug:
+        try:
+            cond_json = json.dumps(tree, sort_keys=True)
+            # la clave solo es válida si el round-trip JSON reproduce el árbol: tuplas, claves
+            # no-str, etc. se normalizarían y el compilador las aceptaría cuando no debería
+            if json.loads(cond_json) != tree:
+                cond_json = None
+        except (TypeError, ValueError):
+            cond_json = None  # no serializable: se compila sin cache
+        if cond_json is not None:
+            try:
+                return _compile_cached(cond_json)
+            except Exception:
+                pass  # los errores no se cachean; se recompila abajo para reportar el path real
+    return _compile_predicate(tree, debug=debug, path=path, log=log, capture_ctx_keys=capture_ctx_keys)
+
+def _compile_predicate(tree: dict, *,
+                       debug: bool = False,
+                       path: str = "ROOT",
+                       log: Optional[Callable[[str], None]] = None,
+                       capture_ctx_keys: bool = False) -> Matcher:
     if not isinstance(tree, dict) or not tree:
         raise ValueError("Nodo inválido: se esperaba objeto no vacío.")
     keys = [k for k in ("all","any","none") if k in tree]
@@ -132,8 +163,8 @@ def compile_predicate(tree: dict, *,
     if "all" in tree:
         raw_children = _ensure_list(tree, "all")
         children = [
-            compile_predicate(c, debug=debug, path=f"{path}.ALL[{i}]", log=log,
-                              capture_ctx_keys=capture_ctx_keys)
+            _compile_predicate(c, debug=debug, path=f"{path}.ALL[{i}]", log=log,
+                               capture_ctx_keys=capture_ctx_keys)
             for i, c in enumerate(raw_children)
         ]
         children = _flatten("all", children)
@@ -142,8 +173,8 @@ def compile_predicate(tree: dict, *,
     if "any" in tree:
         raw_children = _ensure_list(tree, "any")
         children = [
-            compile_predicate(c, debug=debug, path=f"{path}.ANY[{i}]", log=log,
-                              capture_ctx_keys=capture_ctx_keys)
+            _compile_predicate(c, debug=debug, path=f"{path}.ANY[{i}]", log=log,
+                               capture_ctx_keys=capture_ctx_keys)
             for i, c in enumerate(raw_children)
         ]
         children = _flatten("any", children)
@@ -157,11 +188,11 @@ def compile_predicate(tree: dict, *,
             node = CONST_TRUE
         else:
             # compilá los hijos como un ANY (aplica flatten/folding allí)
-            any_node = compile_predicate({"any": raw_children},
-                                        debug=debug,
-                                        path=f"{path}.NONE.ANY",
-                                        log=log,
-                                        capture_ctx_keys=capture_ctx_keys)
+            any_node = _compile_predicate({"any": raw_children},
+                                         debug=debug,
+                                         path=f"{path}.NONE.ANY",
+                                         log=log,
+                                         capture_ctx_keys=capture_ctx_keys)
             # doblado de constantes (más explícito)
             if any_node is CONST_TRUE:
                 node = CONST_FALSE
@@ -1,5 +1,8 @@
 from __future__ import annotations
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
+from itertools import accumulate
+from operator import attrgetter
 from typing import Any, Dict, List, Optional, Callable, Protocol, Tuple
 
 from kp_gateway_selector.utils.pix_key_types import PixKeyTypes
@@ -17,7 +20,59 @@ from kp_gateway_selector.utils.logs import setup_logger_json
 
 logger = setup_logger_json("DEBUG", "kp_gateway_selector.ruleset_compiler")
 
-@dataclass(frozen=True)
+# key de orden por priority (attrgetter corre en C, sin lambda por elemento)
+_PRIO_KEY = attrgetter("priority")
+
+# --------------------------------------------------------------------
+# Helpers de pesos (compartidos con el selector)
+# --------------------------------------------------------------------
+
+def _normalize_weights(weights: Dict[str, int]) -> Dict[str, int]:
+    """Clampea negativos a 0, filtra 0s, y normaliza a suma 100 (si > 0)."""
+    cleaned = {k: max(0, int(v)) for k, v in weights.items()}
+    cleaned = {k: v for k, v in cleaned.items() if v > 0}
+    total = sum(cleaned.values())
+    if total == 0:
+        return {}
+    if total == 100:
+        return cleaned
+    # normalizar proporcionalmente a 100
+    acc = 0
+    out: Dict[str, int] = {}
+    items = sorted(cleaned.items())  # orden determinístico
+    for i, (k, v) in enumerate(items):
+        if i == len(items) - 1:
+            out[k] = 100 - acc
+        else:
+            pct = int(round(v * 100.0 / total))
+            out[k] = pct
+            acc += pct
+    # puede quedar 99/101 por redondeo; ajustar último arriba.
+    diff = 100 - sum(out.values())
+    if diff:
+        last = next(reversed(out))
+        out[last] += diff
+    return out
+
+def _weighted_table(
+    weights: Dict[str, int],
+    gateways: Dict[str, GatewaySelectorGatewayConfig],
+) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+    """
+    Precalcula (nombres, acumulados) para una acción WEIGHTED sobre los gateways dados.
+    Mismo orden determinístico y normalización que el camino por request del selector.
+    """
+    return _cumulative_table(_normalize_weights({k: v for k, v in weights.items() if k in gateways}))
+
+def _cumulative_table(norm: Dict[str, int]) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+    """(nombres ordenados, sumas acumuladas) a partir de pesos ya normalizados."""
+    names = tuple(sorted(norm))
+    return names, tuple(accumulate(norm[name] for name in names))
+
+# slots=True (py>=3.10): instancias más chicas y acceso a atributos por descriptor fijo
+_DC_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_DC_SLOTS)
 class CompiledRule:
     """
     Regla lista para ejecutar en el hot path.
@@ -31,7 +86,7 @@ class CompiledRule:
     predicate: Matcher
     action: Dict[str, Any]
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_DC_SLOTS)
 class CompiledRuleset:
     """
     Snapshot inmutable del ruleset activo.
@@ -53,6 +108,39 @@ class CompiledRuleset:
     loaded_at_ms: float
     total_rules: int
 
+    # Subconjunto de `rules` con enabled=True (mismo orden); derivado en __post_init__
+    # para que el hot path no tenga que saltear reglas deshabilitadas.
+    enabled_rules: Tuple[CompiledRule, ...] = field(init=False, repr=False, compare=False)
+    # Gateways habilitados y fuera de mantenimiento al momento del snapshot; derivado en
+    # __post_init__ para no re-chequear disponibilidad en cada request.
+    available_gateways: Dict[str, GatewaySelectorGatewayConfig] = field(init=False, repr=False, compare=False)
+    # Tabla (nombres, acumulados) por regla WEIGHTED enabled: los pesos son invariantes del
+    # snapshot, así que se normalizan una sola vez. Se indexa por identidad (id(rule)) y no
+    # por rule.id: dos reglas con el mismo id no se pisan, y una regla ajena al snapshot con
+    # un id repetido no hereda pesos que no son suyos. `rules` mantiene vivos los objetos.
+    weighted_tables: Dict[int, Tuple[Tuple[str, ...], Tuple[int, ...]]] = field(init=False, repr=False, compare=False)
+    # Seed de sticky por regla WEIGHTED ("ruleset:version:salt:rule"), armado una vez por
+    # snapshot en vez de formatearlo en cada request. Se indexa por id(rule) como
+    # weighted_tables, pero el valor usa rule.id: los buckets no cambian entre recargas.
+    sticky_seeds: Dict[int, str] = field(init=False, repr=False, compare=False)
+    # Cache (id(rule), clave sticky) -> gateway elegido, lo llena el selector. Vive con el
+    # snapshot: un hot-reload lo invalida sin coordinación extra.
+    sticky_cache: Dict[Tuple[int, str], GatewaySelectorGatewayConfig] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "enabled_rules", tuple(r for r in self.rules if r.enabled))
+        object.__setattr__(self, "available_gateways", {
+            name: gw for name, gw in self.gateways.items() if gw.is_enabled and not gw.in_maintenance
+        })
+        weighted = [r for r in self.enabled_rules if r.action.get("route") == "WEIGHTED"]
+        object.__setattr__(self, "weighted_tables", {
+            id(r): _weighted_table(r.action.get("weights") or {}, self.available_gateways)
+            for r in weighted
+        })
+        seed_prefix = f"{self.ruleset_id}:{self.version}:{self.sticky_salt or ''}:"
+        object.__setattr__(self, "sticky_seeds", {id(r): f"{seed_prefix}{r.id}" for r in weighted})
+        object.__setattr__(self, "sticky_cache", {})
+
 # --------------------------------------------------------------------
 # Interfaz de repositorio (adaptala a tu ORM)
 # --------------------------------------------------------------------
@@ -212,7 +300,7 @@ async def compile_ruleset(
             raise ValueError(f"[RULE[{rid}]] Error al compilar: {ex}") from ex
 
     # Orden defensivo por priority (aunque el repo ya la entregue ordenada)
-    compiled_rules.sort(key=lambda x: x.priority)
+    compiled_rules.sort(key=_PRIO_KEY)
 
     # 4) Default gateway (opcional)
     default_gw = rs.default_gateway
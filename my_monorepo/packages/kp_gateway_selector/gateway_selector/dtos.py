@@ -1,18 +1,97 @@
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
+import sys
+from decimal import Decimal
+from typing import Any, Iterable, Optional
 
-class GatewaySelectorGatewayConfigDTO(BaseModel):
+import orjson
+from pydantic import BaseModel, ConfigDict, PrivateAttr, field_validator
+
+try:
+    import cbor2  # opcional, encoding binario para tráfico entre servicios
+    HAS_CBOR = True
+except Exception:
+    cbor2 = None
+    HAS_CBOR = False
+
+# condition_json/action vienen de la DB: pueden traer claves no-str o Decimals. Se
+# serializan igual que model_dump_json (claves como str, Decimal como string).
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError
+
+def _dumps(obj: Any) -> bytes:
+    # TypeError también cubre lo que orjson no soporta (p.ej. ints de más de 64 bits):
+    # los llamadores caen a la serialización de pydantic
+    return orjson.dumps(obj, default=_orjson_default, option=_ORJSON_OPTIONS)
+
+class _FrozenDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+
+    # Cache del JSON serializado: el DTO es inmutable, así que se calcula una sola vez.
+    # Los atributos privados viven fuera de __dict__ y no se filtran al JSON.
+    # Ojo: frozen=True es superficial; los campos dict (action, condition_json) no deben
+    # mutarse después del primer to_json_bytes() o el JSON cacheado queda desactualizado.
+    _json_cache: Optional[bytes] = PrivateAttr(default=None)
+
+    def __eq__(self, other):
+        # la igualdad de pydantic compara también los atributos privados; el cache de JSON
+        # no debe influir
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.__dict__ == other.__dict__
+
+    # model_copy (con o sin update) pasa por __copy__/__deepcopy__ y pydantic copia los
+    # atributos privados: la copia arranca sin cache para no serializar datos viejos.
+    def __copy__(self):
+        copied = super().__copy__()
+        copied._json_cache = None
+        return copied
+
+    def __deepcopy__(self, memo=None):
+        copied = super().__deepcopy__(memo)
+        copied._json_cache = None
+        return copied
+
+    def _as_dict(self) -> dict:
+        # Uso interno de los serializadores de este módulo: devuelve el __dict__ vivo (solo
+        # los campos declarados) sin copiarlo, así que no debe mutarse ni exponerse.
+        return self.__dict__
+
+    def _dump_json(self, compact: bool) -> bytes:
+        data = self._as_dict()
+        if compact:
+            data = {k: v for k, v in data.items() if v is not None}
+        try:
+            return _dumps(data)
+        except TypeError:
+            return self.model_dump_json(exclude_none=compact).encode("utf-8")
+
+    def to_json_bytes(self, compact: bool = False) -> bytes:
+        # compact=True omite los campos en None (menos bytes en el wire); por defecto se
+        # mantiene el contrato con todas las claves.
+        if compact:
+            return self._dump_json(compact=True)
+        if self._json_cache is None:
+            self._json_cache = self._dump_json(compact=False)
+        return self._json_cache
+
+    def to_json(self, compact: bool = False):
+        return self.to_json_bytes(compact).decode("utf-8")
+
+    def to_cbor(self) -> bytes:
+        if not HAS_CBOR:
+            raise RuntimeError("to_cbor requiere el módulo 'cbor2'.")
+        return cbor2.dumps(self._as_dict())
+
+class GatewaySelectorGatewayConfigDTO(_FrozenDTO):
     id: int
     name: str
     is_enabled: bool
     in_maintenance: bool
 
-    def to_json(self):
-        return self.model_dump_json()
-
-class GatewaySelectorRuleDTO(BaseModel):
-    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+class GatewaySelectorRuleDTO(_FrozenDTO):
     id: int
     rule_set_id: int
     priority: int
@@ -23,11 +102,22 @@ class GatewaySelectorRuleDTO(BaseModel):
     condition_json: Optional[dict]
     action: dict
 
-    def to_json(self):
-        return self.model_dump_json()
+    # condition_type y action.route vienen de un vocabulario chico y cerrado: internarlos
+    # hace que todas las reglas compartan el mismo objeto str.
+    @field_validator("condition_type")
+    @classmethod
+    def _intern_condition_type(cls, v: str) -> str:
+        return sys.intern(v)
 
-class GatewaySelectorRuleSetDTO(BaseModel):
-    model_config = ConfigDict(from_attributes=True, extra="ignore", frozen=True)
+    @field_validator("action")
+    @classmethod
+    def _intern_route(cls, v: dict) -> dict:
+        route = v.get("route")
+        if isinstance(route, str):
+            v["route"] = sys.intern(route)
+        return v
+
+class GatewaySelectorRuleSetDTO(_FrozenDTO):
     id: int
     name: str
     is_active: bool
@@ -35,5 +125,20 @@ class GatewaySelectorRuleSetDTO(BaseModel):
     default_gateway: Optional[str]
     version: int
 
-    def to_json(self):
-        return self.model_dump_json()
\ No newline at end of file
+def dump_rules(rules: Iterable[GatewaySelectorRuleDTO]) -> bytes:
+    """Serializa una colección de reglas como array JSON en una sola llamada a orjson."""
+    rules = list(rules)
+    try:
+        return _dumps([r._as_dict() for r in rules])
+    except TypeError:
+        # alguna regla no es serializable por orjson: cada una resuelve su propio fallback
+        return orjson.dumps([orjson.Fragment(r.to_json_bytes()) for r in rules])
+
+def dump_ruleset_with_rules(ruleset: GatewaySelectorRuleSetDTO, rules: Iterable[GatewaySelectorRuleDTO]) -> bytes:
+    """Serializa el ruleset con sus reglas anidadas bajo la clave 'rules'."""
+    rules = list(rules)
+    try:
+        return _dumps({**ruleset._as_dict(), "rules": [r._as_dict() for r in rules]})
+    except TypeError:
+        # el objeto del ruleset siempre tiene campos: se reabre su JSON para anidar 'rules'
+        return ruleset.to_json_bytes()[:-1] + b',"rules":' + dump_rules(rules) + b"}"
@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+import sys
+from dataclasses import dataclass, field as dc_field
+from typing import Dict, Any, Optional, Union
 from decimal import Decimal, InvalidOperation, getcontext
 
 from .utils import _get_field
@@ -16,6 +17,15 @@ def _to_decimal(val: Any) -> Optional[Decimal]:
     except (InvalidOperation, ValueError, TypeError):
         return None
 
+def _to_minor_units(v: Optional[Decimal], scale: int) -> Optional[Union[int, Decimal]]:
+    """Expresa un límite en minor units (v * 10**scale); int si es entero, para comparar sin Decimal."""
+    if v is None:
+        return None
+    scaled = v.scaleb(scale)
+    if not scaled.is_finite():
+        return scaled  # Infinity/NaN no tienen representación entera: se comparan como Decimal
+    return int(scaled) if scaled == scaled.to_integral_value() else scaled
+
 @dataclass(frozen=True)
 class AmountRange(Matcher):
     """
@@ -78,6 +88,17 @@ class AmountRange(Matcher):
     # Si False, exclusivo (<).
     max_inclusive: bool
 
+    # Límites expresados en minor units (solo coerce="int"), precalculados en __post_init__:
+    # el hot path compara el entero del ctx directamente, sin construir ni escalar Decimals.
+    min_units: Optional[Union[int, Decimal]] = dc_field(init=False, repr=False, compare=False)
+    max_units: Optional[Union[int, Decimal]] = dc_field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # solo el camino coerce="int" lee los límites en minor units
+        is_int = self.coerce == "int"
+        object.__setattr__(self, "min_units", _to_minor_units(self.min_v, self.scale) if is_int else None)
+        object.__setattr__(self, "max_units", _to_minor_units(self.max_v, self.scale) if is_int else None)
+
     @property
     def name(self) -> str:
         return "AMOUNT_RANGE"
@@ -90,32 +111,32 @@ class AmountRange(Matcher):
         # coerción
         if self.coerce == "int":
             try:
-                iv = int(raw)
+                amt = int(raw)
             except Exception:
                 return False
-            amt = Decimal(iv)
-            if self.scale and self.scale > 0:
-                amt = amt.scaleb(-self.scale)  # divide por 10**scale
+            # el monto queda en minor units: se compara contra los límites ya escalados
+            min_v, max_v = self.min_units, self.max_units
         else:
             amt = _to_decimal(raw)
             if amt is None:
                 return False
+            min_v, max_v = self.min_v, self.max_v
 
         # comparaciones
-        if self.min_v is not None:
+        if min_v is not None:
             if self.min_inclusive:
-                if amt < self.min_v:
+                if amt < min_v:
                     return False
             else:
-                if amt <= self.min_v:
+                if amt <= min_v:
                     return False
 
-        if self.max_v is not None:
+        if max_v is not None:
             if self.max_inclusive:
-                if amt > self.max_v:
+                if amt > max_v:
                     return False
             else:
-                if amt >= self.max_v:
+                if amt >= max_v:
                     return False
 
         return True
@@ -128,6 +149,7 @@ def make_amount_range(cond: dict) -> Matcher:
     field = cond.get("field", "amount")
     if not isinstance(field, str):
         raise ValueError("AMOUNT_RANGE.field debe ser string.")
+    field = sys.intern(field)
 
     coerce = cond.get("coerce", "decimal")
     if coerce not in ("int", "decimal", None):
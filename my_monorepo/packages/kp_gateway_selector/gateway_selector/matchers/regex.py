@@ -1,5 +1,6 @@
+import sys
 from dataclasses import dataclass
-from typing import Dict, Any, Iterable, Optional
+from typing import Dict, Any, Iterable, Optional, Tuple
 
 from .utils import _get_field
 from .base import Matcher, register_matcher
@@ -31,6 +32,30 @@ def _compose_flags(flags: Optional[Iterable[str]]) -> int:
         f |= _FLAG_MAP[name]
     return f
 
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+def _literal_suffix(pattern: str) -> Optional[str]:
+    """
+    Si `pattern` es un literal anclado al final (ej. "@kamipay\\.io$"), devuelve el literal
+    sin escapes; si tiene cualquier otro metacaracter, None.
+    """
+    if not pattern.endswith("$") or pattern.endswith("\\$"):
+        return None
+    out = []
+    it = iter(pattern[:-1])
+    for ch in it:
+        if ch == "\\":
+            nxt = next(it, None)
+            # solo escapes de puntuación (\d, \w, \b, etc. no son literales)
+            if nxt is None or nxt.isalnum() or nxt == "_":
+                return None
+            out.append(nxt)
+        elif ch in _REGEX_META:
+            return None
+        else:
+            out.append(ch)
+    return "".join(out) or None
+
 @dataclass(frozen=True)
 class RegexMatcher(Matcher):
     """
@@ -89,6 +114,10 @@ class RegexMatcher(Matcher):
     # Objeto regex precompilado (re.Pattern o regex.Pattern)
     compiled: Any
 
+    # Cuando el patrón es "<literal>$" en modo search y sin flags: (literal, literal + "\n"),
+    # resuelto con un único str.endswith sin pasar por el motor de regex. None = usar `compiled`.
+    literal_suffixes: Optional[Tuple[str, str]] = None
+
     @property
     def name(self) -> str:
         return "REGEX"
@@ -111,6 +140,10 @@ class RegexMatcher(Matcher):
             # Quizás podríamos elegir truncar: v = v[:self.max_len]
             return False
 
+        # fast path: "$" matchea al final o antes de un "\n" final
+        if self.literal_suffixes is not None:
+            return v.endswith(self.literal_suffixes)
+
         # ejecutar con modo/timeout si hay 'regex' disponible
         if HAS_REGEX and self.engine_timeout_ms:
             timeout = self.engine_timeout_ms / 1000.0
@@ -147,6 +180,7 @@ def make_regex(cond: dict) -> Matcher:
 
     if not isinstance(field, str) or not isinstance(pattern, str):
         raise ValueError("REGEX: 'field' y 'pattern' son obligatorios (string).")
+    field = sys.intern(field)
     if mode not in ("search", "match", "fullmatch"):
         raise ValueError("REGEX.mode debe ser 'search'|'match'|'fullmatch'.")
     if coerce not in (None, "str", "lower-str"):
@@ -163,6 +197,10 @@ def make_regex(cond: dict) -> Matcher:
     flags_value = _compose_flags(flags)
     compiled = rx_mod.compile(pattern, flags_value)
 
+    # "$" matchea al final o antes de un "\n" final: ambos sufijos se precalculan acá
+    literal = _literal_suffix(pattern) if mode == "search" and not flags_value else None
+    literal_suffixes = (literal, literal + "\n") if literal is not None else None
+
     return RegexMatcher(
         field=field,
         pattern=pattern,
@@ -172,4 +210,5 @@ def make_regex(cond: dict) -> Matcher:
         max_len=max_len,
         engine_timeout_ms=engine_timeout_ms,
         compiled=compiled,
+        literal_suffixes=literal_suffixes,
     )
\ No newline at end of file
@@ -3,6 +3,11 @@ from typing import Any, Dict
 
 def _get_field(ctx: Dict[str, Any], path: str) -> Any:
     # Soporta paths simples "api_user_id" o anidados "request.headers.x"
+    # Las factories internan `path` (sys.intern): el lookup contra las keys literales
+    # del ctx resuelve por identidad antes de comparar strings.
+    if "." not in path:
+        # caso común: campo de primer nivel, sin split
+        return ctx.get(path) if isinstance(ctx, dict) else None
     cur = ctx
     for part in path.split("."):
         if isinstance(cur, dict) and part in cur:
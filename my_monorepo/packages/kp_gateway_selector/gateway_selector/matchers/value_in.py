@@ -1,9 +1,17 @@
-from dataclasses import dataclass
-from typing import Any, Dict, FrozenSet, Optional
+import sys
+from dataclasses import dataclass, field as dc_field
+from typing import Any, Callable, Dict, FrozenSet, Optional
 
 from .utils import _get_field
 from .base import Matcher, register_matcher
 
+# coerce -> función de transformación (resuelta una vez, no por request)
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "int": int,
+    "str": str,
+    "lower-str": lambda v: str(v).lower(),
+}
+
 @dataclass(frozen=True)
 class ValueIn(Matcher):
     """
@@ -43,6 +51,12 @@ class ValueIn(Matcher):
     # - None: no se transforma
     coerce: Optional[str] = None
 
+    # Función de coerción derivada de `coerce` en __post_init__ (None = no se transforma)
+    coerce_fn: Optional[Callable[[Any], Any]] = dc_field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "coerce_fn", _COERCERS.get(self.coerce))
+
     @property
     def name(self) -> str: return "VALUE_IN"
 
@@ -50,13 +64,10 @@ class ValueIn(Matcher):
         v = _get_field(ctx, self.field)
         if v is None:
             return False
-        if self.coerce == "int":
-            try: v = int(v)
+        fn = self.coerce_fn
+        if fn is not None:
+            try: v = fn(v)
             except Exception: return False
-        elif self.coerce == "str":
-            v = str(v)
-        elif self.coerce == "lower-str":
-            v = str(v).lower()
         return v in self.values
 
     def __str__(self) -> str:
@@ -68,14 +79,11 @@ def make_value_in(cond: dict) -> Matcher:
     values = cond.get("values", [])
     if not isinstance(field, str) or not isinstance(values, list):
         raise ValueError("VALUE_IN: field str y values list requeridos")
+    field = sys.intern(field)
     coerce = cond.get("coerce")
     if coerce not in (None, "int", "str", "lower-str"):
         raise ValueError("VALUE_IN: coerce inválido")
     # Precoerción homogénea del set (para no convertir en cada request)
-    def to_coerced(val):
-        if coerce == "int": return int(val)
-        if coerce == "str": return str(val)
-        if coerce == "lower-str": return str(val).lower()
-        return val
-    canon = frozenset(to_coerced(x) for x in values)
+    to_coerced = _COERCERS.get(coerce)
+    canon = frozenset(to_coerced(x) for x in values) if to_coerced else frozenset(values)
     return ValueIn(field=field, values=canon, coerce=coerce)
\ No newline at end of file
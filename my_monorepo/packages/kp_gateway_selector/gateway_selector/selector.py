@@ -1,11 +1,13 @@
 # selector.py
 from __future__ import annotations
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from enum import Enum
+from typing import Callable, Dict, Any, Optional, Tuple
 from hashlib import sha256
 from uuid import uuid4
 
-from kp_gateway_selector.gateway_selector.compiler.ruleset_compiler import CompiledRuleset, CompiledRule
+from kp_gateway_selector.gateway_selector.compiler.ruleset_compiler import CompiledRuleset, CompiledRule, _cumulative_table, _normalize_weights
 from kp_gateway_selector.gateway_selector.context import GatewaySelectorCtx
 from kp_gateway_selector.postgresql.gateway_selector.models import GatewaySelectorGatewayConfig
 
@@ -13,12 +15,29 @@ from kp_gateway_selector.postgresql.gateway_selector.models import GatewaySelect
 # Estructuras de salida (útiles para log/telemetría)
 # ---------------------------------------------------------
 
+class Reason(str, Enum):
+    """
+    Motivo de la decisión. Hereda de str: compara igual a su valor ("matched", ...)
+    y se serializa/loguea como tal; internamente se compara por identidad.
+    """
+    MATCHED = "matched"
+    DENIED = "denied"
+    NO_RULE = "no_rule"
+    FALLBACK = "fallback"
+    NO_AVAILABLE_GW = "no_available_gw"
+    FIXED_UNAVAILABLE = "fixed_unavailable"
+    WEIGHTED_UNAVAILABLE = "weighted_unavailable"
+    UNKNOWN_ROUTE = "unknown_route"
+
+    __str__ = str.__str__
+    __format__ = str.__format__
+
 @dataclass(frozen=True)
 class Decision:
     matched_rule_id: Optional[int]
     route: Optional[str]
     gateway: Optional[str]
-    reason: str  # "matched", "denied", "no_rule", "fallback", "no_available_gw"
+    reason: Reason
 
 # ---------------------------------------------------------
 # Helpers
@@ -27,37 +46,21 @@ class Decision:
 def _gw_ok(gw: GatewaySelectorGatewayConfig) -> bool:
     return gw.is_enabled and not gw.in_maintenance
 
-def _normalize_weights(weights: Dict[str, int]) -> Dict[str, int]:
-    """Clampea negativos a 0, filtra 0s, y normaliza a suma 100 (si > 0)."""
-    cleaned = {k: max(0, int(v)) for k, v in weights.items()}
-    cleaned = {k: v for k, v in cleaned.items() if v > 0}
-    total = sum(cleaned.values())
-    if total == 0:
-        return {}
-    if total == 100:
-        return cleaned
-    # normalizar proporcionalmente a 100
-    acc = 0
-    out: Dict[str, int] = {}
-    items = sorted(cleaned.items())  # orden determinístico
-    for i, (k, v) in enumerate(items):
-        if i == len(items) - 1:
-            out[k] = 100 - acc
-        else:
-            pct = int(round(v * 100.0 / total))
-            out[k] = pct
-            acc += pct
-    # puede quedar 99/101 por redondeo; ajustar último arriba.
-    diff = 100 - sum(out.values())
-    if diff:
-        last = next(reversed(out))
-        out[last] += diff
-    return out
-
 def _sticky_hash_bucket(key: str, seed: str) -> int:
     """Devuelve un número 0..99 estable para (key, seed)."""
-    h = sha256((key + ":" + seed).encode("utf-8")).hexdigest()
-    return int(h, 16) % 100
+    # digest() + int.from_bytes da el mismo entero que int(hexdigest(), 16), sin pasar por hex:
+    # los buckets no cambian (los usuarios sticky no se reasignan).
+    h = sha256((key + ":" + seed).encode("utf-8")).digest()
+    return int.from_bytes(h, "big") % 100
+
+def _sticky_key(sticky_by: Optional[str], ctx: Dict[str, Any]) -> str:
+    """Clave de sticky (si no hay, aleatorio estable por request)."""
+    if sticky_by:
+        key_val = ctx.get(sticky_by)
+        # si no está ese campo en ctx, caemos a un UUID por request
+        if key_val is not None:
+            return str(key_val)
+    return str(uuid4())
 
 def _pick_weighted(
     weights: Dict[str, int],
@@ -66,8 +69,9 @@ def _pick_weighted(
     sticky_by: Optional[str],
     ctx: Dict[str, Any],
     seed: str,
+    hash_fn: Optional[Callable[[str, str], int]] = None,
 ) -> Optional[GatewaySelectorGatewayConfig]:
-    """Elige un GW ponderado, con sticky opcional."""
+    """Elige un GW ponderado, con sticky opcional. hash_fn reemplaza a _sticky_hash_bucket (tests)."""
     # filtrar por disponibilidad
     candidates = {k: v for k, v in weights.items() if k in gateways and _gw_ok(gateways[k])}
     if not candidates:
@@ -76,63 +80,107 @@ def _pick_weighted(
     if not norm:
         return None
 
-    # clave de sticky (si no hay, aleatorio estable por request)
-    if sticky_by:
-        key_val = ctx.get(sticky_by)
-        # si no está ese campo en ctx, caemos a un UUID por request
-        key = str(key_val) if key_val is not None else str(uuid4())
-    else:
-        key = str(uuid4())
-
-    bucket = _sticky_hash_bucket(key, seed)  # 0..99
-
-    cumulative = 0
+    bucket = (hash_fn or _sticky_hash_bucket)(_sticky_key(sticky_by, ctx), seed)  # 0..99
     # orden determinístico
-    for gw_name, pct in sorted(norm.items()):
-        cumulative += pct
-        if bucket < cumulative:
-            return gateways[gw_name]
-    # por seguridad (no debería pasar)
-    last_name = next(reversed(sorted(norm)))
-    return gateways[last_name]
+    return _pick_from_table(_cumulative_table(norm), gateways, bucket)
+
+def _pick_from_table(
+    table: Tuple[Tuple[str, ...], Tuple[int, ...]],
+    gateways: Dict[str, GatewaySelectorGatewayConfig],
+    bucket: int,
+) -> Optional[GatewaySelectorGatewayConfig]:
+    """Elige un GW desde una tabla (nombres, acumulados) ya normalizada a 100."""
+    names, cumulative = table
+    # primer acumulado > bucket (búsqueda binaria en C)
+    idx = bisect_right(cumulative, bucket)
+    if idx == len(names):
+        # por seguridad (no debería pasar)
+        idx -= 1
+    return gateways[names[idx]]
+
+# Tope de entradas del cache sticky por snapshot (FIFO al llenarse)
+_STICKY_CACHE_MAX = 65536
+
+def _pick_sticky(
+    rule: CompiledRule,
+    key: str,
+    table: Tuple[Tuple[str, ...], Tuple[int, ...]],
+    snapshot: CompiledRuleset,
+) -> GatewaySelectorGatewayConfig:
+    """Pick sticky con cache acotado en el snapshot: (regla, clave) siempre resuelve al mismo GW."""
+    cache = snapshot.sticky_cache
+    ck = (id(rule), key)  # por identidad, igual que weighted_tables
+    gw = cache.get(ck)
+    if gw is None:
+        bucket = _sticky_hash_bucket(key, snapshot.sticky_seeds[id(rule)])
+        gw = _pick_from_table(table, snapshot.available_gateways, bucket)
+        if len(cache) >= _STICKY_CACHE_MAX:
+            try:
+                del cache[next(iter(cache))]
+            except (StopIteration, KeyError, RuntimeError):
+                pass  # otro thread ya desalojó
+        cache[ck] = gw
+    return gw
 
 # ---------------------------------------------------------
 # Resolve action
 # ---------------------------------------------------------
 
+def _resolve_deny(rule: CompiledRule, snapshot: CompiledRuleset, ctx: Dict[str, Any]):
+    return None, Reason.DENIED
+
+def _resolve_fixed(rule: CompiledRule, snapshot: CompiledRuleset, ctx: Dict[str, Any]):
+    # available_gateways ya excluye deshabilitados/en mantenimiento (precalculado en el snapshot)
+    gw = snapshot.available_gateways.get(rule.action.get("gateway"))
+    if gw:
+        return gw, Reason.MATCHED
+    return None, Reason.FIXED_UNAVAILABLE
+
+def _resolve_weighted(rule: CompiledRule, snapshot: CompiledRuleset, ctx: Dict[str, Any]):
+    action = rule.action
+    sticky_by = action.get("sticky_by")  # "api_user_id" | "pix_key" | ...
+    table = snapshot.weighted_tables.get(id(rule))
+    if table is None:
+        # Seed para sticky: aisla entre rulesets y reglas
+        seed = f"{snapshot.ruleset_id}:{snapshot.version}:{snapshot.sticky_salt or ''}:{rule.id}"
+        weights = action.get("weights") or {}
+        gw = _pick_weighted(weights, snapshot.available_gateways, sticky_by=sticky_by, ctx=ctx, seed=seed)
+    elif table[0]:
+        # tabla acumulada y seed precalculados en el snapshot: solo resta hashear y recorrer
+        key_val = ctx.get(sticky_by) if sticky_by else None
+        if key_val is None:
+            # sin clave sticky: bucket aleatorio por request (no cacheable)
+            bucket = _sticky_hash_bucket(_sticky_key(None, ctx), snapshot.sticky_seeds[id(rule)])
+            gw = _pick_from_table(table, snapshot.available_gateways, bucket)
+        else:
+            gw = _pick_sticky(rule, str(key_val), table, snapshot)
+    else:
+        gw = None  # ningún gateway disponible con peso > 0
+    if gw:
+        return gw, Reason.MATCHED
+    return None, Reason.WEIGHTED_UNAVAILABLE
+
+def _resolve_unknown(rule: CompiledRule, snapshot: CompiledRuleset, ctx: Dict[str, Any]):
+    return None, Reason.UNKNOWN_ROUTE
+
+# Dispatch por route: un lookup de dict (las rutas vienen internadas desde el DTO)
+# en lugar de la cadena de comparaciones de strings.
+_ROUTE_HANDLERS = {
+    "DENY": _resolve_deny,
+    "FIXED": _resolve_fixed,
+    "WEIGHTED": _resolve_weighted,
+}
+
 def resolve_action(
     rule: CompiledRule,
     snapshot: CompiledRuleset,
     ctx: Dict[str, Any],
-) -> tuple[Optional[GatewaySelectorGatewayConfig], str]:
+) -> tuple[Optional[GatewaySelectorGatewayConfig], Reason]:
     """
-    Devuelve (gateway, reason). Si la acción es DENY, (None, "denied").
+    Devuelve (gateway, reason). Si la acción es DENY, (None, Reason.DENIED).
     """
-    action = rule.action
-    route = action.get("route")
-
-    # Seed para sticky: aisla entre rulesets y reglas
-    seed = f"{snapshot.ruleset_id}:{snapshot.version}:{snapshot.sticky_salt or ''}:{rule.id}"
-
-    if route == "DENY":
-        return None, "denied"
-
-    if route == "FIXED":
-        gw_name = action.get("gateway")
-        gw = snapshot.gateways.get(gw_name)
-        if gw and _gw_ok(gw):
-            return gw, "matched"
-        return None, "fixed_unavailable"
-
-    if route == "WEIGHTED":
-        sticky_by = action.get("sticky_by")  # "api_user_id" | "pix_key" | ...
-        weights = action.get("weights") or {}
-        gw = _pick_weighted(weights, snapshot.gateways, sticky_by=sticky_by, ctx=ctx, seed=seed)
-        if gw:
-            return gw, "matched"
-        return None, "weighted_unavailable"
-
-    return None, "unknown_route"
+    handler = _ROUTE_HANDLERS.get(rule.action.get("route"), _resolve_unknown)
+    return handler(rule, snapshot, ctx)
 
 # ---------------------------------------------------------
 # Gateway selector (hot path)
@@ -154,13 +202,12 @@ def select_gateway(
         - si no → None con reason="no_rule" o "no_available_gw".
     """
     # 1) evaluar reglas en orden
-    for rule in snapshot.rules:
-        if not rule.enabled:
-            continue
+    # (solo reglas enabled, precalculadas en el snapshot)
+    for rule in snapshot.enabled_rules:
         if rule.predicate(ctx):
             gw, reason = resolve_action(rule, snapshot, ctx)
-            if reason == "denied":
-                dec = Decision(rule.id, "DENY", None, "denied")
+            if reason is Reason.DENIED:
+                dec = Decision(rule.id, "DENY", None, Reason.DENIED)
                 if on_decision: on_decision(dec, ctx)
                 return None, dec
             if gw:
@@ -172,18 +219,18 @@ def select_gateway(
 
     # 2) fallback global (si corresponde)
     if allow_fallback and snapshot.default_gateway:
-        gw = snapshot.gateways.get(snapshot.default_gateway)
-        if gw and _gw_ok(gw):
-            dec = Decision(None, None, gw.name, "fallback")
+        gw = snapshot.available_gateways.get(snapshot.default_gateway)
+        if gw:
+            dec = Decision(None, None, gw.name, Reason.FALLBACK)
             if on_decision: on_decision(dec, ctx)
             return gw, dec
 
     # 3) sin regla y sin fallback disponible
     # distinguir entre “no hubo regla” vs “hubo pero no había gw disponible”
-    reason = "no_rule"
+    reason = Reason.NO_RULE
     # heurística simple: si existía al menos una regla enabled → “no_available_gw”
-    if any(r.enabled for r in snapshot.rules):
-        reason = "no_available_gw"
+    if snapshot.enabled_rules:
+        reason = Reason.NO_AVAILABLE_GW
 
     dec = Decision(None, None, None, reason)
     if on_decision: on_decision(dec, ctx)
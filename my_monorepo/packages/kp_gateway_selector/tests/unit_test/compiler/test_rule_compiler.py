@@ -7,6 +7,7 @@ from kp_gateway_selector.gateway_selector.compiler.rule_compiler import (
     Any,
     NoneOf,
     DebugWrap,
+    _compile_cached,
 )
 from kp_gateway_selector.gateway_selector.matchers.base import Matcher, build_matcher
 
@@ -43,6 +44,10 @@ def mock_build_matcher(monkeypatch):
         _build_matcher,
         raising=True,
     )
+    # predicates built with the mocked builder must not leak to other tests
+    _compile_cached.cache_clear()
+    yield
+    _compile_cached.cache_clear()
 
 
 def test_compile_invalid_node_types():
@@ -175,3 +180,24 @@ def test_compile_any_with_const_true_is_const_true(mock_build_matcher):
     rule = {"any": [{"type": "CONST_TRUE"}, {"type": "mock_true"}]}
     matcher = compile_predicate(rule)
     assert matcher is CONST_TRUE
+
+
+def test_compile_predicate_is_memoized():
+    cond = {"type": "VALUE_IN", "field": "api_user_id", "values": [1, 2]}
+    first = compile_predicate(cond)
+    assert compile_predicate({"values": [1, 2], "type": "VALUE_IN", "field": "api_user_id"}) is first
+    assert compile_predicate(cond, debug=True) is not first
+
+
+def test_compile_predicate_cache_does_not_normalize_tree():
+    # a tuple serializes like a list; the cache must not accept what the compiler rejects
+    with pytest.raises(ValueError, match="VALUE_IN: field str y values list requeridos"):
+        compile_predicate({"type": "VALUE_IN", "field": "api_user_id", "values": (1, 2)})
+    compile_predicate({"type": "VALUE_IN", "field": "api_user_id", "values": [1, 2]})
+    with pytest.raises(ValueError, match="VALUE_IN: field str y values list requeridos"):
+        compile_predicate({"type": "VALUE_IN", "field": "api_user_id", "values": (1, 2)})
+
+
+def test_compile_predicate_error_keeps_path():
+    with pytest.raises(ValueError, match=r"\[RULE\[7\]\.ALL\[0\]\]"):
+        compile_predicate({"all": [{"any": [], "all": []}]}, path="RULE[7]")
@@ -67,6 +67,22 @@ def test_amount_range_call_coerce_int_invalid():
     assert matcher({"f": "abc"}) is False
 
 
+def test_amount_range_call_coerce_int_scaled_bounds():
+    matcher = AmountRange("f", "int", 2, Decimal("10.00"), Decimal("100.005"), True, False)
+    assert matcher.min_units == 1000
+    assert matcher({"f": 1000}) is True
+    assert matcher({"f": 999}) is False
+    assert matcher({"f": 10000}) is True
+    assert matcher({"f": 10001}) is False
+
+
+@pytest.mark.parametrize("coerce", ["int", "decimal"])
+def test_amount_range_infinite_bounds(coerce):
+    matcher = make_amount_range({"coerce": coerce, "scale": 2, "min": "-Infinity", "max": "Infinity"})
+    assert matcher({"amount": 12345}) is True
+    assert matcher({"amount": -12345}) is True
+
+
 def test_amount_range_call_coerce_decimal():
     matcher = AmountRange("f", "decimal", 0, None, None, True, True)
     assert matcher({"f": "123.45"}) is True
@@ -4,6 +4,7 @@ import sys
 from unittest.mock import Mock
 from kp_gateway_selector.gateway_selector.matchers.regex import (
     _compose_flags,
+    _literal_suffix,
     make_regex,
     RegexMatcher,
 )
@@ -152,6 +153,32 @@ def test_regex_matcher_call_with_timeout_fullmatch(monkeypatch):
     matcher({"f": "p"})
     mock_rx_mod.compile().fullmatch.assert_called_with("p", timeout=0.1)
 
+@pytest.mark.parametrize("pattern, expected", [
+    (r"@private\.com$", "@private.com"),
+    ("abc$", "abc"),
+    (r"a\$", None),
+    (r"\d+$", None),
+    ("a.c$", None),
+    ("abc", None),
+    ("$", None),
+])
+def test_literal_suffix(pattern, expected):
+    assert _literal_suffix(pattern) == expected
+
+
+@pytest.mark.parametrize("value", ["user@private.com", "user@private.com\n", "user@public.com", "@private.comx", ""])
+def test_regex_matcher_literal_suffix_matches_engine(value):
+    matcher = make_regex({"type": "REGEX", "field": "f", "pattern": r"@private\.com$"})
+    assert matcher.literal_suffixes == ("@private.com", "@private.com\n")
+    assert matcher({"f": value}) is bool(re.search(r"@private\.com$", value))
+
+
+def test_regex_matcher_literal_suffix_skipped_with_flags():
+    matcher = make_regex({"type": "REGEX", "field": "f", "pattern": "abc$", "flags": ["IGNORECASE"]})
+    assert matcher.literal_suffixes is None
+    assert matcher({"f": "xABC"}) is True
+
+
 def test_regex_matcher_name_property():
     """
     Tests the name property of the RegexMatcher.
@@ -1,3 +1,4 @@
+import sys
 import pytest
 from kp_gateway_selector.gateway_selector.matchers.value_in import ValueIn, make_value_in
 
@@ -17,6 +18,18 @@ def test_make_value_in_success():
     assert matcher.values == frozenset([101, 102, 103])
     assert matcher.coerce == "int"
 
+def test_make_value_in_interns_field():
+    field = "".join(["api_user", "_id"])
+    matcher = make_value_in({"field": field, "values": [1]})
+    assert matcher.field is sys.intern("api_user_id")
+    assert matcher({"api_user_id": 1}) is True
+    assert matcher({"request": {"api_user_id": 1}}) is False
+
+def test_value_in_nested_field():
+    matcher = make_value_in({"field": "request.user", "values": ["u"]})
+    assert matcher({"request": {"user": "u"}}) is True
+    assert matcher({"request": "u"}) is False
+
 def test_make_value_in_invalid_field():
     with pytest.raises(ValueError, match="VALUE_IN: field str y values list requeridos"):
         make_value_in({"field": 123, "values": []})
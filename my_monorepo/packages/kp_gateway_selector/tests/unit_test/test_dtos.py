@@ -1,33 +1,34 @@
-import json
+import copy
+from decimal import Decimal
+
+import orjson
+import pytest
 from kp_gateway_selector.gateway_selector.dtos import (
     GatewaySelectorGatewayConfigDTO,
     GatewaySelectorRuleDTO,
     GatewaySelectorRuleSetDTO,
+    dump_rules,
+    dump_ruleset_with_rules,
 )
 
-def test_gateway_selector_gateway_config_dto_to_json():
-    """
-    Tests the to_json method of GatewaySelectorGatewayConfigDTO.
-    """
+@pytest.fixture(scope="module")
+def gw_config_dto():
     dto = GatewaySelectorGatewayConfigDTO(
         id=1,
         name="test-gw",
         is_enabled=True,
         in_maintenance=False,
     )
-    json_str = dto.to_json()
-    data = json.loads(json_str)
-    assert data == {
+    expected = {
         "id": 1,
         "name": "test-gw",
         "is_enabled": True,
         "in_maintenance": False,
     }
+    return dto, expected
 
-def test_gateway_selector_rule_dto_to_json():
-    """
-    Tests the to_json method of GatewaySelectorRuleDTO.
-    """
+@pytest.fixture(scope="module")
+def rule_dto():
     dto = GatewaySelectorRuleDTO(
         id=1,
         rule_set_id=1,
@@ -39,9 +40,7 @@ def test_gateway_selector_rule_dto_to_json():
         condition_json={"field": "api_user_id", "values": [1, 2, 3]},
         action={"route": "FIXED", "gateway": "test-gw"},
     )
-    json_str = dto.to_json()
-    data = json.loads(json_str)
-    assert data == {
+    expected = {
         "id": 1,
         "rule_set_id": 1,
         "priority": 1,
@@ -52,11 +51,10 @@ def test_gateway_selector_rule_dto_to_json():
         "condition_json": {"field": "api_user_id", "values": [1, 2, 3]},
         "action": {"route": "FIXED", "gateway": "test-gw"},
     }
+    return dto, expected
 
-def test_gateway_selector_rule_set_dto_to_json():
-    """
-    Tests the to_json method of GatewaySelectorRuleSetDTO.
-    """
+@pytest.fixture(scope="module")
+def rule_set_dto():
     dto = GatewaySelectorRuleSetDTO(
         id=1,
         name="test-ruleset",
@@ -65,13 +63,165 @@ def test_gateway_selector_rule_set_dto_to_json():
         default_gateway="default-gw",
         version=1,
     )
-    json_str = dto.to_json()
-    data = json.loads(json_str)
-    assert data == {
+    expected = {
         "id": 1,
         "name": "test-ruleset",
         "is_active": True,
         "sticky_salt": "salty",
         "default_gateway": "default-gw",
         "version": 1,
-    }
\ No newline at end of file
+    }
+    return dto, expected
+
+@pytest.mark.parametrize("dto_fixture", ["gw_config_dto", "rule_dto", "rule_set_dto"])
+def test_dto_to_json_roundtrip(dto_fixture, request):
+    """
+    Tests the to_json and to_json_bytes methods of every DTO.
+    """
+    dto, expected = request.getfixturevalue(dto_fixture)
+    json_str = dto.to_json()
+    data = orjson.loads(json_str)
+    assert data == expected
+    assert orjson.loads(dto.to_json_bytes()) == data
+
+@pytest.mark.parametrize("dto_fixture", ["gw_config_dto", "rule_dto", "rule_set_dto"])
+def test_dto_json_keys_match_declared_fields(dto_fixture, request):
+    """
+    Tests that serialization emits exactly the declared fields, in order, and no private attrs.
+    """
+    dto, _ = request.getfixturevalue(dto_fixture)
+    dto.to_json_bytes()  # populate the private cache before serializing again
+    assert list(orjson.loads(dto.to_json_bytes())) == list(type(dto).model_fields)
+
+def test_rule_dto_to_json_compact(rule_dto):
+    """
+    Tests that compact serialization omits None-valued fields.
+    """
+    dto, expected = rule_dto
+    data = orjson.loads(dto.to_json(compact=True))
+    assert "condition_value" not in data
+    assert data == {k: v for k, v in expected.items() if v is not None}
+    assert "condition_value" in orjson.loads(dto.to_json())
+
+@pytest.mark.parametrize("dto_fixture", ["gw_config_dto", "rule_dto", "rule_set_dto"])
+def test_dto_to_cbor_roundtrip(dto_fixture, request):
+    """
+    Tests the to_cbor method of every DTO.
+    """
+    cbor2 = pytest.importorskip("cbor2")
+    dto, expected = request.getfixturevalue(dto_fixture)
+    assert cbor2.loads(dto.to_cbor()) == expected
+
+def _make_rule(i: int) -> GatewaySelectorRuleDTO:
+    return GatewaySelectorRuleDTO(
+        id=i,
+        rule_set_id=1,
+        priority=i,
+        name=f"rule-{i}",
+        enabled=True,
+        condition_type="USER",
+        condition_value=str(i),
+        condition_json=None,
+        action={"route": "FIXED", "gateway": "test-gw"},
+    )
+
+@pytest.mark.parametrize("count", [0, 1, 1000])
+def test_dump_rules(count):
+    """
+    Tests that dump_rules serializes every rule, in order, as a JSON array.
+    """
+    rules = [_make_rule(i) for i in range(count)]
+    data = orjson.loads(dump_rules(rules))
+    assert len(data) == count
+    assert data == [orjson.loads(r.to_json()) for r in rules]
+    if count:
+        assert data[0]["id"] == 0
+
+def test_dump_ruleset_with_rules():
+    """
+    Tests that dump_ruleset_with_rules nests the rules under the ruleset fields.
+    """
+    ruleset = GatewaySelectorRuleSetDTO(
+        id=1,
+        name="test-ruleset",
+        is_active=True,
+        sticky_salt=None,
+        default_gateway=None,
+        version=1,
+    )
+    rules = [_make_rule(i) for i in range(3)]
+    data = orjson.loads(dump_ruleset_with_rules(ruleset, rules))
+    assert data["id"] == 1
+    assert data["name"] == "test-ruleset"
+    assert [r["id"] for r in data["rules"]] == [0, 1, 2]
+
+@pytest.mark.parametrize("overrides", [
+    {"condition_json": {1: "a"}},
+    {"id": 2**70},
+    {"condition_json": {"min": Decimal("1.5")}},
+])
+def test_dto_json_matches_pydantic_for_values_orjson_rejects(overrides):
+    """
+    Tests that non-str keys, big ints and Decimals serialize like model_dump_json.
+    """
+    dto = _make_rule(1).model_copy(update=overrides)
+    expected = dto.model_dump_json().encode()
+    assert dto.to_json_bytes() == expected
+    assert dump_rules([dto]) == b"[" + expected + b"]"
+    ruleset = GatewaySelectorRuleSetDTO(
+        id=1, name="rs", is_active=True, sticky_salt=None, default_gateway=None, version=1,
+    )
+    assert dump_ruleset_with_rules(ruleset, iter([dto])) == ruleset.to_json_bytes()[:-1] + b',"rules":[' + expected + b"]}"
+
+def test_rule_dto_interns_condition_type_and_route():
+    """
+    Tests that condition_type and action.route are interned across rule DTOs.
+    """
+    a = _make_rule(1)
+    b = GatewaySelectorRuleDTO(
+        id=2,
+        rule_set_id=1,
+        priority=2,
+        name="rule-2",
+        enabled=True,
+        condition_type="".join(["US", "ER"]),
+        condition_value="2",
+        condition_json=None,
+        action={"route": "".join(["FIX", "ED"]), "gateway": "test-gw"},
+    )
+    assert a.condition_type is b.condition_type
+    assert a.action["route"] is b.action["route"]
+
+def test_to_json_bytes_is_cached():
+    """
+    Tests that repeated serializations reuse the same bytes object.
+    """
+    dto = _make_rule(1)
+    first = dto.to_json_bytes()
+    assert dto.to_json_bytes() is first
+    assert "_json_cache" not in orjson.loads(first)
+
+def test_equality_ignores_json_cache():
+    """
+    Tests that a populated JSON cache does not affect DTO equality.
+    """
+    dto = _make_rule(1)
+    dto.to_json_bytes()
+    assert dto == _make_rule(1)
+    assert dto.to_json() == _make_rule(1).to_json()
+
+@pytest.mark.parametrize("copy_fn", [
+    lambda dto: dto.model_copy(update={"id": 2}),
+    lambda dto: dto.model_copy(update={"id": 2}, deep=True),
+    lambda dto: copy.copy(dto).model_copy(update={"id": 2}),
+    lambda dto: copy.deepcopy(dto).model_copy(update={"id": 2}),
+])
+def test_copies_do_not_reuse_cached_json(copy_fn):
+    """
+    Tests that copies serialize their own fields, not the original's cached JSON.
+    """
+    dto = _make_rule(1)
+    dto.to_json()
+    copied = copy_fn(dto)
+    assert orjson.loads(copied.to_json())["id"] == 2
+    assert orjson.loads(dto.to_json())["id"] == 1
@@ -1,5 +1,7 @@
 import math
+import re
 import time
+from operator import attrgetter
 from decimal import Decimal
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -14,7 +16,7 @@ import pytest
 from kp_gateway_selector.gateway_selector.compiler.rule_compiler import compile_predicate, ConstTrue, ConstFalse
 import regex
 
-from collections import Counter
+_TZ_SP = ZoneInfo("America/Sao_Paulo")
 
 # --- Helper function to build a ruleset snapshot ---
 
@@ -29,14 +31,20 @@ def _build_snapshot(
         version=1,
         name="test-ruleset",
         sticky_salt="test-salt",
-        rules=tuple(sorted(rules, key=lambda r: r.priority)),
+        rules=tuple(sorted(rules, key=attrgetter("priority"))),
         gateways=gateways,
         default_gateway=default_gateway,
-        loaded_at_ms=int(time.time() * 1000),
+        loaded_at_ms=time.time_ns() // 1_000_000,
         total_rules=len(rules),
     )
 
 
+@pytest.fixture(scope="module")
+def bulk_ctxs() -> List[Dict[str, Any]]:
+    """10k raw contexts shared by the weighted distribution runs."""
+    return [{"api_user_id": i} for i in range(10_000)]
+
+
 # --- Test Suite ---
 
 
@@ -45,15 +53,17 @@ class TestGatewaySelector:
     Test suite for the core logic of the gateway selector.
     """
 
-    def setup_method(self):
-        """Set up common test data."""
-        self.ctx = make_ctx(
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def _common_data(cls):
+        """Set up common test data once per class (read-only for every test)."""
+        cls.ctx = make_ctx(
             api_user_id=123,
             pix_key="test@example.com",
             pix_key_type="EMAIL",
             amount=Decimal("100.00"),
         )
-        self.gateways = {
+        cls.gateways = {
             "gateway_a": GatewaySelectorGatewayConfig(
                 name="gateway_a", is_enabled=True, in_maintenance=False
             ),
@@ -143,6 +153,7 @@ class TestGatewaySelector:
             action={"route": "FIXED", "gateway": "gateway_b"},
         )
         snapshot = _build_snapshot([disabled_rule, enabled_rule], self.gateways)
+        assert snapshot.enabled_rules == (enabled_rule,)
 
         # Act
         gateway, decision = select_gateway(self.ctx, snapshot)
@@ -196,15 +207,17 @@ class TestGatewaySelectorFilters:
     Tests for the various filter conditions (matchers) of a rule.
     """
 
-    def setup_method(self):
-        self.gateways = {
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def _common_data(cls):
+        cls.gateways = {
             "main_gw": GatewaySelectorGatewayConfig(
                 name="main_gw", is_enabled=True, in_maintenance=False
             ),
         }
-        self.default_gw = "default_gw"
-        self.gateways[self.default_gw] = GatewaySelectorGatewayConfig(
-            name=self.default_gw, is_enabled=True, in_maintenance=False
+        cls.default_gw = "default_gw"
+        cls.gateways[cls.default_gw] = GatewaySelectorGatewayConfig(
+            name=cls.default_gw, is_enabled=True, in_maintenance=False
         )
 
     def _get_rule(self, cond: Dict[str, Any]) -> CompiledRule:
@@ -410,6 +423,8 @@ class TestGatewaySelectorFilters:
             {"type": "REGEX", "field": "pix_key", "pattern": "@private\.com$"}
         )
         snapshot = _build_snapshot([rule], self.gateways, self.default_gw)
+        # the pattern is compiled once at build time, not per request
+        assert isinstance(rule.predicate.compiled, (re.Pattern, regex.Pattern))
 
         # Act
         gw_match, _ = select_gateway(make_ctx(pix_key="user@private.com"), snapshot)
@@ -434,17 +449,17 @@ class TestGatewaySelectorFilters:
             }
         )
         snapshot = _build_snapshot([rule], self.gateways, self.default_gw)
-
-        tz = ZoneInfo("America/Sao_Paulo")
+        # the matcher resolves the tz once at build time and shares the cached instance
+        assert rule.predicate.tz is _TZ_SP
 
         # Act
         # Time inside the window
         gw_match, _ = select_gateway(
-            make_ctx(now=datetime(2023, 1, 1, 10, 30, tzinfo=tz)), snapshot
+            make_ctx(now=datetime(2023, 1, 1, 10, 30, tzinfo=_TZ_SP)), snapshot
         )
         # Time outside the window
         gw_no_match, _ = select_gateway(
-            make_ctx(now=datetime(2023, 1, 1, 20, 0, tzinfo=tz)), snapshot
+            make_ctx(now=datetime(2023, 1, 1, 20, 0, tzinfo=_TZ_SP)), snapshot
         )
 
         # Assert
@@ -455,9 +470,11 @@ class TestGatewaySelectorFilters:
 class TestGatewaySelectorActions:
     """Tests for the various action types of a rule."""
 
-    def setup_method(self):
-        self.ctx = make_ctx(api_user_id=123)
-        self.gateways = {
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def _common_data(cls):
+        cls.ctx = make_ctx(api_user_id=123)
+        cls.gateways = {
             "gateway_a": GatewaySelectorGatewayConfig(
                 name="gateway_a", is_enabled=True, in_maintenance=False
             ),
@@ -521,7 +538,7 @@ class TestGatewaySelectorActions:
         {"gateway_a": 90, "gateway_b": 10},
         {"gateway_a": 100, "gateway_b": 0}
     ])
-    def test_weighted_distribution(self, weights):
+    def test_weighted_distribution(self, weights, bulk_ctxs):
         """
         Multiples tests con un ruleset WEIGHTED, en 10k requests
         la proporción debe estar dentro de 5 sigma puntos porcentuales.
@@ -529,16 +546,16 @@ class TestGatewaySelectorActions:
         action = {"route": "WEIGHTED", "weights": weights}
         rule = CompiledRule(id=1, priority=1, enabled=True, name="weighted", predicate=ConstTrue(), action=action)
         snapshot = _build_snapshot([rule], self.gateways)
-        N = 10_000
-        ctr = Counter()
+        N = len(bulk_ctxs)
+        hits_a = 0
 
-        for i in range(N):
-            ctx = {"api_user_id": i}  # cambia valor para distribuir sticky
+        for ctx in bulk_ctxs:
             gw, decision = select_gateway(ctx, snapshot)
             assert gw is not None, decision
-            ctr[gw.name] += 1
+            if gw.name == "gateway_a":
+                hits_a += 1
 
-        ratio = ctr["gateway_a"] / N
+        ratio = hits_a / N
         p_a = weights["gateway_a"] / 100
         sigma = math.sqrt(p_a * (1-p_a) / N)  # desviación estándar
         margin = 5*sigma
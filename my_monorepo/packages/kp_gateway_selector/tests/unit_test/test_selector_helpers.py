@@ -1,24 +1,29 @@
+import orjson
 import pytest
+from hashlib import sha256
+from types import MappingProxyType
 from kp_gateway_selector.gateway_selector.selector import (
     _normalize_weights,
     _sticky_hash_bucket,
     _pick_weighted,
+    Reason,
     resolve_action,
     select_gateway,
 )
-from kp_gateway_selector.gateway_selector.compiler.ruleset_compiler import CompiledRule, CompiledRuleset
+from kp_gateway_selector.gateway_selector.compiler.ruleset_compiler import CompiledRule, CompiledRuleset, _weighted_table
 from kp_gateway_selector.postgresql.gateway_selector.models import GatewaySelectorGatewayConfig
 
 
-@pytest.fixture
+# Read-only fixtures: built once per module; tests that need other rules build their own snapshot.
+@pytest.fixture(scope="module")
 def gateways():
-    return {
+    return MappingProxyType({
         "a": GatewaySelectorGatewayConfig(id=1, name="a", is_enabled=True, in_maintenance=False),
         "b": GatewaySelectorGatewayConfig(id=2, name="b", is_enabled=True, in_maintenance=False),
         "c": GatewaySelectorGatewayConfig(id=3, name="c", is_enabled=False, in_maintenance=False),
-    }
+    })
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def ruleset(gateways):
     return CompiledRuleset(
         ruleset_id=1,
@@ -62,6 +67,12 @@ def test_sticky_hash_bucket_distribution():
     # A very basic check for distribution, not a statistical test
     assert len(set(buckets)) > 50
 
+def test_sticky_hash_bucket_is_stable_across_releases():
+    # buckets are persisted implicitly by sticky users; they must never shift
+    assert [_sticky_hash_bucket(str(i), "1:1:salt:7") for i in range(5)] == [
+        int(sha256(f"{i}:1:1:salt:7".encode("utf-8")).hexdigest(), 16) % 100 for i in range(5)
+    ]
+
 def test_pick_weighted_no_candidates(gateways):
     assert _pick_weighted({}, gateways, sticky_by=None, ctx={}, seed="s") is None
 
@@ -76,39 +87,47 @@ def test_pick_weighted_sticky_by_key_present(gateways):
     gw2 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={"user_id": "123"}, seed="s")
     assert gw1.name == gw2.name
 
-def test_pick_weighted_sticky_by_key_not_present(gateways, monkeypatch):
-    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._sticky_hash_bucket", lambda k, s: 10)
-    gw1 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={}, seed="s")
-    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._sticky_hash_bucket", lambda k, s: 90)
-    gw2 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={}, seed="s")
+def test_pick_weighted_sticky_by_key_not_present(gateways):
+    gw1 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={}, seed="s", hash_fn=lambda k, s: 10)
+    gw2 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={}, seed="s", hash_fn=lambda k, s: 90)
     assert gw1.name == "a"
     assert gw2.name == "b"
 
-def test_pick_weighted_no_sticky(gateways, monkeypatch):
-    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._sticky_hash_bucket", lambda k, s: 10)
-    gw1 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by=None, ctx={}, seed="s")
-    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._sticky_hash_bucket", lambda k, s: 90)
-    gw2 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by=None, ctx={}, seed="s")
+def test_pick_weighted_no_sticky(gateways):
+    gw1 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by=None, ctx={}, seed="s", hash_fn=lambda k, s: 10)
+    gw2 = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by=None, ctx={}, seed="s", hash_fn=lambda k, s: 90)
     assert gw1.name == "a"
     assert gw2.name == "b"
 
-def test_pick_weighted_bucketing(gateways, monkeypatch):
-    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._sticky_hash_bucket", lambda k, s: 49)
-    gw = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={"user_id": "123"}, seed="s")
+def test_pick_weighted_bucketing(gateways):
+    gw = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={"user_id": "123"}, seed="s", hash_fn=lambda k, s: 49)
     assert gw.name == "a"
 
-    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._sticky_hash_bucket", lambda k, s: 50)
-    gw = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={"user_id": "123"}, seed="s")
+    gw = _pick_weighted({"a": 50, "b": 50}, gateways, sticky_by="user_id", ctx={"user_id": "123"}, seed="s", hash_fn=lambda k, s: 50)
     assert gw.name == "b"
 
 def test_pick_weighted_unreachable_code(gateways, monkeypatch):
     # This test covers the safety net at the end of _pick_weighted,
     # which should not be reached in normal execution.
     monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._normalize_weights", lambda w: {"a": 10, "b": 20})
-    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._sticky_hash_bucket", lambda k, s: 40)
-    gw = _pick_weighted({"a": 10, "b": 20}, gateways, sticky_by=None, ctx={}, seed="s")
+    gw = _pick_weighted({"a": 10, "b": 20}, gateways, sticky_by=None, ctx={}, seed="s", hash_fn=lambda k, s: 40)
     assert gw.name == "b" # 'b' is the last in sorted order
 
+@pytest.mark.parametrize("weights", [{"a": 50, "b": 50}, {"a": 1, "b": 2, "c": 1}, {"b": 33, "a": 33}, {"c": 100}])
+def test_weighted_table_matches_pick_weighted(gateways, weights):
+    available = {k: v for k, v in gateways.items() if v.is_enabled and not v.in_maintenance}
+    names, cumulative = _weighted_table(weights, available)
+    for bucket in range(100):
+        expected = _pick_weighted(weights, gateways, sticky_by=None, ctx={}, seed="s", hash_fn=lambda k, s: bucket)
+        picked = next((n for n, acc in zip(names, cumulative) if bucket < acc), None)
+        assert picked == (expected.name if expected else None)
+
+def test_reason_behaves_as_its_string_value():
+    assert Reason.FALLBACK == "fallback"
+    assert str(Reason.NO_AVAILABLE_GW) == "no_available_gw"
+    assert f"{Reason.MATCHED}" == "matched"
+    assert orjson.dumps({"reason": Reason.DENIED}) == b'{"reason":"denied"}'
+
 def test_resolve_action_deny(ruleset):
     rule = CompiledRule(id=1, priority=1, enabled=True, name="r", predicate=lambda ctx: True, action={"route": "DENY"})
     gw, reason = resolve_action(rule, ruleset, {})
@@ -141,6 +160,54 @@ def test_resolve_action_weighted_unavailable(ruleset, monkeypatch):
     assert gw is None
     assert reason == "weighted_unavailable"
 
+def test_ruleset_available_gateways(ruleset):
+    assert set(ruleset.available_gateways) == {"a", "b"}
+
+def test_resolve_action_weighted_tables_are_per_rule_object(gateways):
+    to_a = CompiledRule(id=7, priority=1, enabled=True, name="r1", predicate=lambda ctx: True,
+                        action={"route": "WEIGHTED", "weights": {"a": 100}, "sticky_by": "user_id"})
+    to_b = CompiledRule(id=7, priority=2, enabled=True, name="r2", predicate=lambda ctx: True,
+                        action={"route": "WEIGHTED", "weights": {"b": 100}, "sticky_by": "user_id"})
+    snapshot = CompiledRuleset(
+        ruleset_id=1, version=1, name="rs", sticky_salt="s", rules=(to_a, to_b), gateways=gateways,
+        default_gateway=None, loaded_at_ms=0, total_rules=2,
+    )
+    # rules sharing an id keep their own tables
+    assert resolve_action(to_a, snapshot, {"user_id": "u1"})[0].name == "a"
+    assert resolve_action(to_b, snapshot, {"user_id": "u1"})[0].name == "b"
+    # a rule outside the snapshot with a repeated id uses its own weights
+    foreign = CompiledRule(id=7, priority=3, enabled=True, name="r3", predicate=lambda ctx: True,
+                           action={"route": "WEIGHTED", "weights": {"b": 100}})
+    other_snapshot = CompiledRuleset(
+        ruleset_id=1, version=1, name="rs", sticky_salt="s", rules=(to_a,), gateways=gateways,
+        default_gateway=None, loaded_at_ms=0, total_rules=1,
+    )
+    assert resolve_action(foreign, other_snapshot, {})[0].name == "b"
+
+def test_ruleset_sticky_seeds(gateways):
+    rule = CompiledRule(id=7, priority=1, enabled=True, name="r", predicate=lambda ctx: True, action={"route": "WEIGHTED", "weights": {"a": 100}})
+    snapshot = CompiledRuleset(
+        ruleset_id=1, version=2, name="rs", sticky_salt="salt", rules=(rule,), gateways=gateways,
+        default_gateway=None, loaded_at_ms=0, total_rules=1,
+    )
+    assert snapshot.sticky_seeds == {id(rule): "1:2:salt:7"}
+
+def test_resolve_action_sticky_cache(gateways, monkeypatch):
+    rule = CompiledRule(id=7, priority=1, enabled=True, name="r", predicate=lambda ctx: True,
+                        action={"route": "WEIGHTED", "weights": {"a": 50, "b": 50}, "sticky_by": "user_id"})
+    snapshot = CompiledRuleset(
+        ruleset_id=1, version=1, name="rs", sticky_salt="s", rules=(rule,), gateways=gateways,
+        default_gateway=None, loaded_at_ms=0, total_rules=1,
+    )
+    calls = []
+    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._sticky_hash_bucket", lambda k, s: calls.append(k) or 10)
+    monkeypatch.setattr("kp_gateway_selector.gateway_selector.selector._STICKY_CACHE_MAX", 2)
+    for user in ("u1", "u1", "u2", "u3"):
+        gw, _ = resolve_action(rule, snapshot, {"user_id": user})
+        assert gw.name == "a"
+    assert calls == ["u1", "u2", "u3"]
+    assert set(snapshot.sticky_cache) == {(id(rule), "u2"), (id(rule), "u3")}
+
 def test_resolve_action_unknown_route(ruleset):
     rule = CompiledRule(id=1, priority=1, enabled=True, name="r", predicate=lambda ctx: True, action={"route": "UNKNOWN"})
     gw, reason = resolve_action(rule, ruleset, {})
@@ -2,8 +2,11 @@ import datetime
 from decimal import Decimal
 import json
 import logging
+from logging.handlers import MemoryHandler
+import time
 import uuid
 from unittest.mock import Mock, patch
+import orjson
 import pytest
 
 from kp_gateway_selector.utils.logs import (
@@ -140,6 +143,21 @@ class TestCustomJSONEncoder:
         assert result == "2024-01-15T10:30:45"
         assert isinstance(result, str)
 
+    def test_encode_date(self):
+        """Test encoding date objects."""
+        encoder = CustomJSONEncoder()
+
+        assert encoder.default(datetime.date(2024, 1, 15)) == "2024-01-15"
+
+    def test_encode_subclass_falls_back_to_isinstance(self):
+        """Test that subclasses of supported types are still encoded."""
+        class MyDatetime(datetime.datetime):
+            pass
+
+        encoder = CustomJSONEncoder()
+
+        assert encoder.default(MyDatetime(2024, 1, 15, 10, 30, 45)) == "2024-01-15T10:30:45"
+
     def test_encode_unsupported_type(self):
         """Test encoding unsupported types raises TypeError."""
         encoder = CustomJSONEncoder()
@@ -171,6 +189,21 @@ class TestJSONFormatter:
         assert "-" in result  # Date separators
         assert ":" in result  # Time separators
 
+    @pytest.mark.parametrize("tz_name", ["UTC", "America/Sao_Paulo", "Asia/Kolkata"])
+    def test_format_time_matches_strftime(self, tz_name, monkeypatch):
+        """Test that formatTime keeps the strftime("%Y-%m-%d %H:%M:%S.%f%z") layout."""
+        monkeypatch.setenv("TZ", tz_name)
+        time.tzset()
+        try:
+            record = logging.LogRecord("test_logger", logging.INFO, "test.py", 1, "msg", (), None)
+            record.created = 1705314645.123456
+            expected = datetime.datetime.fromtimestamp(record.created).astimezone().strftime("%Y-%m-%d %H:%M:%S.%f%z")
+
+            assert JSONFormatter().formatTime(record) == expected
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
     def test_format_basic_log(self):
         """Test formatting a basic log record."""
         formatter = JSONFormatter()
@@ -300,6 +333,88 @@ class TestJSONFormatter:
         assert log_data["custom_field"] == "custom_value"
         assert log_data["transaction_id"] == "txn-123"
 
+    def test_format_with_non_native_types(self):
+        """Test that UUID, Decimal, datetime and non-str keys are serialized."""
+        formatter = JSONFormatter()
+        record = logging.LogRecord(
+            name="test_logger",
+            level=logging.INFO,
+            pathname="test.py",
+            lineno=1,
+            msg="Test message",
+            args=(),
+            exc_info=None
+        )
+        test_uuid = uuid.uuid4()
+        record.extra = {
+            "payment_id": test_uuid,
+            "amount": Decimal("10.5"),
+            "at": datetime.datetime(2024, 1, 15, 10, 30, 45),
+            "by_code": {1: "a"},
+        }
+
+        log_data = json.loads(formatter.format(record))
+
+        assert log_data["payment_id"] == str(test_uuid)
+        assert log_data["amount"] == 10.5
+        assert log_data["at"] == "2024-01-15T10:30:45"
+        assert log_data["by_code"] == {"1": "a"}
+
+    def test_format_splices_pre_serialized_fragment(self):
+        """Test that an orjson.Fragment extra is embedded without re-encoding."""
+        formatter = JSONFormatter()
+        record = logging.LogRecord(
+            name="test_logger",
+            level=logging.INFO,
+            pathname="test.py",
+            lineno=1,
+            msg="Test message",
+            args=(),
+            exc_info=None
+        )
+        record.extra = {"payload": orjson.Fragment(b'{"id":1,"tags":["x"]}')}
+
+        result = formatter.format(record)
+
+        assert '"payload":{"id":1,"tags":["x"]}' in result
+        assert json.loads(result)["payload"] == {"id": 1, "tags": ["x"]}
+
+    def test_format_falls_back_to_json_for_big_ints(self):
+        """Test that values orjson rejects, like ints beyond 64 bits, still serialize."""
+        formatter = JSONFormatter()
+        record = logging.LogRecord(
+            name="test_logger",
+            level=logging.INFO,
+            pathname="test.py",
+            lineno=1,
+            msg="Test message",
+            args=(),
+            exc_info=None
+        )
+        record.extra = {"big": 2**70, "amount": Decimal("10.5")}
+
+        log_data = json.loads(formatter.format(record))
+
+        assert log_data["big"] == 2**70
+        assert log_data["amount"] == 10.5
+
+    def test_format_unsupported_type_raises(self):
+        """Test that unsupported extra values still raise TypeError."""
+        formatter = JSONFormatter()
+        record = logging.LogRecord(
+            name="test_logger",
+            level=logging.INFO,
+            pathname="test.py",
+            lineno=1,
+            msg="Test message",
+            args=(),
+            exc_info=None
+        )
+        record.extra = {"obj": object()}
+
+        with pytest.raises(TypeError):
+            formatter.format(record)
+
 
 class TestSetupLoggerJson:
     """Tests for setup_logger_json function."""
@@ -360,6 +475,23 @@ class TestSetupLoggerJson:
         handler = logger.handlers[0]
         assert isinstance(handler.formatter, JSONFormatter)
 
+    def test_setup_logger_buffered(self):
+        """Test that buffer_capacity wraps the JSON handler in a MemoryHandler."""
+        logger = setup_logger_json(level="INFO", module_name="test_buffered", buffer_capacity=2)
+
+        handler = logger.handlers[0]
+        assert isinstance(handler, MemoryHandler)
+        assert handler.capacity == 2
+        assert isinstance(handler.target.formatter, JSONFormatter)
+
+        with patch.object(handler.target, "emit") as mock_emit:
+            logger.info("first")
+            assert mock_emit.call_count == 0
+            logger.info("second")
+            assert mock_emit.call_count == 2
+            logger.error("boom")
+            assert mock_emit.call_count == 3
+
     def test_setup_logger_has_correlation_id_filter(self):
         """Test that the logger has CorrelationIdFilter."""
         logger = setup_logger_json(level="INFO", module_name="test_correlation_filter")
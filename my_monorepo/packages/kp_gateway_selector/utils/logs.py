@@ -2,53 +2,83 @@ import datetime
 from decimal import Decimal
 import json
 import logging
+from logging.handlers import MemoryHandler
 from typing import Any, Optional
 import uuid
 
+import orjson
 from asgi_correlation_id import CorrelationIdFilter
 from kp_gateway_selector.postgresql.database import LOG_SOURCE
 
 
+# Standard LogRecord attributes (plus our correlation id) that the formatters never echo as extras
+_RESERVED_LOG_KEYS = frozenset({
+    "msg", "name", "args", "module", "message", "asctime", "lineno", "thread", "threadName",
+    "levelno", "levelname", "funcName", "pathname", "exc_info", "exc_text", "stack_info",
+    "processName", "process", "relativeCreated", "created", "msecs", "correlation_id",
+})
+# CustomFormatter renders correlation_id_str itself; JSONFormatter merges record.extra itself
+_CUSTOM_FORMATTER_RESERVED = _RESERVED_LOG_KEYS | {"correlation_id_str"}
+_JSON_FORMATTER_RESERVED = _RESERVED_LOG_KEYS | {"extra"}
+
+
 class CustomFormatter(logging.Formatter):
     def format(self, record):
         record.correlation_id_str = f"[{record.correlation_id}]" if hasattr(record, "correlation_id") and record.correlation_id is not None else ""
         msg = super().format(record)
-        extra_info = " ".join(f"{k}={v}" for k, v in record.__dict__.items() if k not in ["msg", "name","args",
-                                                                                          "module", "message", "asctime",
-                                                                                          "lineno", "thread", "threadName",
-                                                                                          "levelno", "levelname", "funcName",
-                                                                                          "pathname", "exc_info", "exc_text",
-                                                                                          "stack_info", "threadName", "processName",
-                                                                                          "process", "processName", "relativeCreated",
-                                                                                          "created", "msecs","correlation_id_str",
-                                                                                          "correlation_id"
-                                                                                          ])
+        # Keep record.__dict__ order so extras print in a stable sequence
+        extra_info = " ".join(f"{k}={v}" for k, v in record.__dict__.items() if k not in _CUSTOM_FORMATTER_RESERVED)
         if extra_info:
             msg = f"{msg} ({extra_info})"
         return msg
 
+# Exact-type dispatch for the common cases: one dict lookup instead of an isinstance chain.
+_JSON_ENCODERS = {
+    uuid.UUID: str,
+    Decimal: float,
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+}
+
+
 class CustomJSONEncoder(json.JSONEncoder):
-    """Custom JSON encoder that handles UUID, Decimal, and datetime objects."""
+    """Custom JSON encoder that handles UUID, Decimal, date and datetime objects."""
 
     def default(self, obj: Any) -> Any:
-        if isinstance(obj, uuid.UUID):
-            return str(obj)
-        if isinstance(obj, Decimal):
-            return float(obj)
-        if isinstance(obj, datetime.datetime):
-            return obj.isoformat()
+        fn = _JSON_ENCODERS.get(type(obj))
+        if fn is not None:
+            return fn(obj)
+        # Subclasses (e.g. pendulum/pandas datetimes) fall back to the isinstance walk
+        for typ, fn in _JSON_ENCODERS.items():
+            if isinstance(obj, typ):
+                return fn(obj)
         return super().default(obj)
 
 
+_CUSTOM_JSON_ENCODER = CustomJSONEncoder()
+
+# orjson handles UUID, date and datetime natively; the encoder only sees the rest (Decimal,
+# subclasses) and keeps raising TypeError for unsupported types. Pre-serialized payloads can
+# be passed in extras as orjson.Fragment and are spliced into the output as-is.
+_ORJSON_DEFAULT = _CUSTOM_JSON_ENCODER.default
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
 class JSONFormatter(logging.Formatter):
     """A formatter that outputs logs in JSON format for CloudWatch."""
 
+    # Record attributes that are not copied into the JSON payload as custom fields
+    _RESERVED = _JSON_FORMATTER_RESERVED
+
     def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
         """Override formatTime to include timezone information and microseconds."""
         # Simply use datetime directly with its own formatting
         dt = datetime.datetime.fromtimestamp(record.created).astimezone()
         # Format: YYYY-MM-DD HH:MM:SS.microseconds+TZOFFSET
-        return dt.strftime("%Y-%m-%d %H:%M:%S.%f%z")
+        # isoformat is cheaper than strftime; drop the colons from its "+HH:MM" offset
+        # so the output matches "%Y-%m-%d %H:%M:%S.%f%z".
+        iso = dt.isoformat(" ", "microseconds")
+        return iso[:26] + iso[26:].replace(":", "")
 
     def format(self, record: logging.LogRecord) -> str:
         # Get the original message
@@ -76,18 +106,15 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "extra") and record.extra:
             log_data.update(record.extra)
 
-        extra_info = {k: v for k, v in record.__dict__.items() if k not in ["msg", "name", "args", "module", "message",
-                                                                            "asctime", "lineno", "thread", "threadName",
-                                                                            "levelno", "levelname", "funcName", "pathname",
-                                                                            "exc_info", "exc_text","stack_info", "threadName",
-                                                                            "processName", "process", "processName",
-                                                                            "relativeCreated", "created", "msecs","extra",
-                                                                            "correlation_id"
-                                                                            ]}
+        extra_info = {k: v for k, v in record.__dict__.items() if k not in self._RESERVED}
         if extra_info:
             log_data.update(extra_info)
         # Return as JSON string
-        return json.dumps(log_data, cls=CustomJSONEncoder)
+        try:
+            return orjson.dumps(log_data, default=_ORJSON_DEFAULT, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # orjson rejects some values json accepts (e.g. ints wider than 64 bits)
+            return json.dumps(log_data, cls=CustomJSONEncoder)
 
 logger = logging.getLogger(LOG_SOURCE)
 logger.setLevel(logging.INFO)
@@ -102,17 +129,23 @@ logger.addHandler(handler)
 def setup_logger_json(
     level: str,
     module_name: str,
+    buffer_capacity: Optional[int] = None,
 ) -> logging.Logger:
     """Configure and return a logger instance for the specified module.
 
     Args:
         module_name: Name of the module requesting the logger
         level: Logging level (default: INFO)
+        buffer_capacity: If set, buffer up to this many records and write them in one flush
+            (records of level ERROR or above flush immediately). Default: unbuffered.
 
     Returns:
         logging.Logger: Configured logger instance
     """
     logger = logging.getLogger(f"{LOG_SOURCE}.{module_name}")
+    # Flush buffered records before dropping the previous handlers
+    for old_handler in logger.handlers:
+        old_handler.flush()
     logger.handlers.clear()
     set_level = {
         "DEBUG": logging.DEBUG,
@@ -133,6 +166,12 @@ def setup_logger_json(
     console_handler.setLevel(level)
     json_formatter = JSONFormatter()
     console_handler.setFormatter(json_formatter)
-    logger.addHandler(console_handler)
+    if buffer_capacity:
+        # logging.shutdown() (registered atexit) flushes the buffer on interpreter exit
+        memory_handler = MemoryHandler(buffer_capacity, flushLevel=logging.ERROR, target=console_handler)
+        memory_handler.setLevel(level)
+        logger.addHandler(memory_handler)
+    else:
+        logger.addHandler(console_handler)
 
     return logger